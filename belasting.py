@@ -7,113 +7,26 @@ from bokeh.models import (
     NumeralTickFormatter,
     Range1d,
 )
+from bokeh.embed import file_html
 from bokeh.palettes import Category10 as palette
-from bokeh.plotting import figure, output_file, save
+from bokeh.plotting import figure
+from bokeh.resources import CDN
 from prettytable import PrettyTable
 
-# --------------------------------------------------------------------------------------------------
-# Constanten.
-# --------------------------------------------------------------------------------------------------
-
-# Box 1 belasting tarieven.
-BOX1_TARIEF = 73031.0
-BOX1_SCHIJF_1_PERC = 0.3693
-BOX1_SCHIJF_2_PERC = 0.4950
-
-# Algemene heffingskorting tarieven.
-AH_TARIEF_1 = 22661.0
-AH_TARIEF_2 = 73031.0
-AH_KORTING = 3070.0
-AH_PERC = 0.06095
-
-# Arbeidskorting tarieven.
-AK_TARIEF_1 = 10741.0
-AK_TARIEF_2 = 23201.0
-AK_TARIEF_3 = 37691.0
-AK_TARIEF_4 = 115295.0
-AK_SCHIJF_1_PERC = 0.08231
-AK_SCHIJF_2_PERC = 0.29861
-AK_SCHIJF_3_PERC = 0.03085
-AK_SCHIJF_4_PERC = 0.06510
-AK_KORTING_1 = 884.0
-AK_KORTING_2 = 4605.0
-AK_KORTING_3 = 5052.0
-
-# --------------------------------------------------------------------------------------------------
-# Functies.
-# --------------------------------------------------------------------------------------------------
-
-
-# Hulpfunctie die 1 van een getal af trekt om leesbaarheid te vergroten.
-def min1(getal: float) -> float:
-    return getal - 1
-
-
-# Bereken het box 1 tarief gegeven een belastbaar inkomen.
-def box1_tarief(inkomen: float) -> float:
-    schijf1_bedrag = min(inkomen, BOX1_TARIEF)
-    schijf2_bedrag = max(inkomen - BOX1_TARIEF, 0)
-
-    tarief = schijf1_bedrag * BOX1_SCHIJF_1_PERC + schijf2_bedrag * BOX1_SCHIJF_2_PERC
-
-    return tarief
-
-
-# Bereken de algemene heffingskorting gegeven een belastbaar inkomen.
-def algemene_heffingskorting(inkomen: float) -> float:
-    if inkomen < AH_TARIEF_1:
-        korting = AH_KORTING
-    elif inkomen < AH_TARIEF_2:
-        korting = AH_KORTING - AH_PERC * (inkomen - min1(AH_TARIEF_1))
-    else:
-        korting = 0.0
-
-    return korting
-
-
-# Bereken de arbeidskorting gegeven een arbeidsinkomen.
-def arbeidskorting(inkomen: float) -> float:
-    if inkomen < AK_TARIEF_1:
-        korting = AK_SCHIJF_1_PERC * inkomen
-    elif inkomen < AK_TARIEF_2:
-        korting = AK_KORTING_1 + AK_SCHIJF_2_PERC * (inkomen - min1(AK_TARIEF_1))
-    elif inkomen < AK_TARIEF_3:
-        # Geen idee waarom nu opeens geen min 1 meer nodig is.
-        korting = AK_KORTING_2 + AK_SCHIJF_3_PERC * (inkomen - AK_TARIEF_2)
-    elif inkomen < AK_TARIEF_4:
-        korting = AK_KORTING_3 - AK_SCHIJF_4_PERC * (inkomen - AK_TARIEF_3)
-    else:
-        korting = 0.0
-
-    return korting
-
-
-# Bereken de totale belasting gegeven een bruto inkomen, rekening houdend met heffingskortingen.
-def belasting(bruto: float) -> float:
-    bedrag = (
-        box1_tarief(bruto) - algemene_heffingskorting(bruto) - arbeidskorting(bruto)
-    )
-
-    return max(bedrag, 0.0)
-
-
-# Bereken het netto inkomen gegeven een bruto inkomen, rekening houdend met heffingskortingen.
-def netto(bruto: float) -> float:
-    return bruto - belasting(bruto)
-
-
-# Bereken het totale belasting percentage gegeven een bruto inkomen.
-def belasting_perc(bruto: float) -> float:
-    if bruto == 0.0:
-        return 0.0
-
-    return belasting(bruto) / bruto
-
-
-# Bereken het marginaal belasting percentage gegeven een bruto inkomen.
-def marginale_belasting(bruto: float) -> float:
-    return belasting(bruto + 1) - belasting(bruto)
-
+from tax_core import (
+    AH_TARIEF_1,
+    AH_TARIEF_2,
+    AK_TARIEF_1,
+    AK_TARIEF_2,
+    AK_TARIEF_3,
+    AK_TARIEF_4,
+    BOX1_TARIEF,
+    algemene_heffingskorting,
+    arbeidskorting,
+    belasting,
+    bereken_kolommen,
+    box1_tarief,
+)
 
 # --------------------------------------------------------------------------------------------------
 # Voorbeelden.
@@ -127,21 +40,23 @@ def print_table(inkomen: float) -> None:
     table.align["Label"] = "l"
     table.align["Value"] = "r"
 
+    # Bereken elke component één keer en leid de afgeleide regels daaruit af, in plaats van
+    # per regel opnieuw de hele pijplijn te doorlopen.
+    tarief = box1_tarief(inkomen)
+    ah_korting = algemene_heffingskorting(inkomen)
+    ak_korting = arbeidskorting(inkomen)
+    bedrag = max(tarief - ah_korting - ak_korting, 0.0)
+    perc = 0.0 if inkomen == 0.0 else bedrag / inkomen
+    marginaal = belasting(inkomen + 1) - bedrag
+
     table.add_row(["Inkomen", f"€ {inkomen:10,.2f}"])
-    table.add_row(["Box 1 tarief", f"€ {box1_tarief(inkomen):10,.2f}"])
-    table.add_row(
-        [
-            "Algemene heffingskorting",
-            f"€ {algemene_heffingskorting(inkomen):10,.2f}",
-        ]
-    )
-    table.add_row(["Arbeidskorting", f"€ {arbeidskorting(inkomen):10,.2f}"])
-    table.add_row(["Effectieve belasting", f"€ {belasting(inkomen):10,.2f}"])
-    table.add_row(["Netto inkomen", f"€ {netto(inkomen):10,.2f}"])
-    table.add_row(["Effectieve belasting", f"% {100*belasting_perc(inkomen):10.2f}"])
-    table.add_row(
-        ["Marginale belasting", f"% {100*marginale_belasting(inkomen):10.2f}"]
-    )
+    table.add_row(["Box 1 tarief", f"€ {tarief:10,.2f}"])
+    table.add_row(["Algemene heffingskorting", f"€ {ah_korting:10,.2f}"])
+    table.add_row(["Arbeidskorting", f"€ {ak_korting:10,.2f}"])
+    table.add_row(["Effectieve belasting", f"€ {bedrag:10,.2f}"])
+    table.add_row(["Netto inkomen", f"€ {inkomen - bedrag:10,.2f}"])
+    table.add_row(["Effectieve belasting", f"% {100*perc:10.2f}"])
+    table.add_row(["Marginale belasting", f"% {100*marginaal:10.2f}"])
 
     print(table)
 
@@ -156,17 +71,53 @@ print_table(150000)
 # Bereid de data voor.
 # --------------------------------------------------------------------------------------------------
 
-x = np.linspace(0, 150000, 1501)
+# De eurokrommen zijn stuksgewijs lineair tussen de tariefgrenzen, dus een dicht grid voegt
+# daar niets toe. Het grid bestaat uit de knikpunten zelf (plus het punt er net voor, zodat de
+# sprongen in de marginale belasting scherp blijven) en een grof basisraster voor de gebogen
+# percentagekromme. Afwijking van het percentage blijft daarmee onder een pixel.
+knikpunten = np.array(
+    [
+        BOX1_TARIEF,
+        AH_TARIEF_1,
+        AH_TARIEF_2,
+        AK_TARIEF_1,
+        AK_TARIEF_2,
+        AK_TARIEF_3,
+        AK_TARIEF_4,
+    ]
+)
+
+# Zoek met bisectie het punt waar de belasting positief wordt: daar knikt max(·, 0).
+nulpunt_lo, nulpunt_hi = 0.0, 150000.0
+while nulpunt_hi - nulpunt_lo > 0.5:
+    midden = 0.5 * (nulpunt_lo + nulpunt_hi)
+    if belasting(midden) > 0.0:
+        nulpunt_hi = midden
+    else:
+        nulpunt_lo = midden
+
+x = np.unique(
+    np.concatenate(
+        [
+            np.linspace(0, 150000, 101),
+            knikpunten,
+            knikpunten - 1.0,
+            [nulpunt_lo, nulpunt_hi],
+        ]
+    )
+)
+
+kolommen = bereken_kolommen(x)
 
 data = {
-    "Bruto inkomen": x,
-    "Netto inkomen": np.array([netto(i) for i in x]),
-    "Box 1 tarief": np.array([box1_tarief(i) for i in x]),
-    "Algemene heffingskorting": np.array([algemene_heffingskorting(i) for i in x]),
-    "Arbeidskorting": np.array([arbeidskorting(i) for i in x]),
-    "Effectieve belasting €": np.array([belasting(i) for i in x]),
-    "Effectieve belasting %": np.array([belasting_perc(i) for i in x]),
-    "Marginale belasting": np.array([marginale_belasting(i) for i in x]),
+    "Bruto inkomen": kolommen[0],
+    "Netto inkomen": kolommen[1],
+    "Box 1 tarief": kolommen[2],
+    "Algemene heffingskorting": kolommen[3],
+    "Arbeidskorting": kolommen[4],
+    "Effectieve belasting €": kolommen[5],
+    "Effectieve belasting %": kolommen[6],
+    "Marginale belasting": kolommen[7],
 }
 
 source = ColumnDataSource(data=data)
@@ -279,5 +230,7 @@ crosshair_tool = CrosshairTool(
 p.add_tools(hover_tool)
 p.add_tools(crosshair_tool)
 
-output_file("index.html", title="Inkomstenbelasting 2023")
-save(p)
+# Render de HTML rechtstreeks met file_html in plaats van via output_file/save: dat vermijdt
+# de stateful output-globals van Bokeh en serialiseert het document maar één keer.
+with open("index.html", "w") as bestand:
+    bestand.write(file_html(p, CDN, "Inkomstenbelasting 2023"))
@@ -0,0 +1,178 @@
+# Kern van de inkomstenbelasting 2023: tarieven en (gevectoriseerde) rekenfuncties, gedeeld
+# door de scripts die tabellen printen en grafieken plotten, zodat de constanten en functies
+# maar één keer worden opgebouwd.
+
+import numpy as np
+
+# --------------------------------------------------------------------------------------------------
+# Constanten.
+# --------------------------------------------------------------------------------------------------
+
+# Box 1 belasting tarieven.
+BOX1_TARIEF = 73031.0
+BOX1_SCHIJF_1_PERC = 0.3693
+BOX1_SCHIJF_2_PERC = 0.4950
+
+# Algemene heffingskorting tarieven.
+AH_TARIEF_1 = 22661.0
+AH_TARIEF_2 = 73031.0
+AH_KORTING = 3070.0
+AH_PERC = 0.06095
+# Afbouwgrens minus 1, één keer vooraf berekend in plaats van bij elke aanroep.
+AH_TARIEF_1_M1 = AH_TARIEF_1 - 1.0
+
+# Arbeidskorting tarieven.
+AK_TARIEF_1 = 10741.0
+AK_TARIEF_2 = 23201.0
+AK_TARIEF_3 = 37691.0
+AK_TARIEF_4 = 115295.0
+AK_SCHIJF_1_PERC = 0.08231
+AK_SCHIJF_2_PERC = 0.29861
+AK_SCHIJF_3_PERC = 0.03085
+AK_SCHIJF_4_PERC = 0.06510
+AK_KORTING_1 = 884.0
+AK_KORTING_2 = 4605.0
+AK_KORTING_3 = 5052.0
+# Schijfgrens minus 1, één keer vooraf berekend in plaats van bij elke aanroep.
+AK_TARIEF_1_M1 = AK_TARIEF_1 - 1.0
+
+# Opzoektabellen per arbeidskortingsschijf: korting = intercept + helling * (inkomen - offset).
+# De offsets volgen de bestaande formules, inclusief de "min 1" eigenaardigheid van schijf 2.
+AK_KNOTS = np.array([0.0, AK_TARIEF_1, AK_TARIEF_2, AK_TARIEF_3, AK_TARIEF_4])
+AK_INTERCEPT = np.array([0.0, AK_KORTING_1, AK_KORTING_2, AK_KORTING_3, 0.0])
+AK_HELLING = np.array(
+    [AK_SCHIJF_1_PERC, AK_SCHIJF_2_PERC, AK_SCHIJF_3_PERC, -AK_SCHIJF_4_PERC, 0.0]
+)
+AK_OFFSET = np.array([0.0, AK_TARIEF_1_M1, AK_TARIEF_2, AK_TARIEF_3, 0.0])
+
+# --------------------------------------------------------------------------------------------------
+# Functies.
+# --------------------------------------------------------------------------------------------------
+
+
+# Bereken het box 1 tarief gegeven een belastbaar inkomen.
+def box1_tarief(inkomen: float) -> float:
+    schijf1_bedrag = min(inkomen, BOX1_TARIEF)
+    schijf2_bedrag = max(inkomen - BOX1_TARIEF, 0)
+
+    tarief = schijf1_bedrag * BOX1_SCHIJF_1_PERC + schijf2_bedrag * BOX1_SCHIJF_2_PERC
+
+    return tarief
+
+
+# Bereken het box 1 tarief voor een hele array van inkomens in één NumPy-bewerking.
+def box1_tarief_vec(inkomen: np.ndarray) -> np.ndarray:
+    return (
+        np.minimum(inkomen, BOX1_TARIEF) * BOX1_SCHIJF_1_PERC
+        + np.maximum(inkomen - BOX1_TARIEF, 0.0) * BOX1_SCHIJF_2_PERC
+    )
+
+
+# Bereken de algemene heffingskorting gegeven een belastbaar inkomen.
+def algemene_heffingskorting(inkomen: float) -> float:
+    if inkomen < AH_TARIEF_1:
+        korting = AH_KORTING
+    elif inkomen < AH_TARIEF_2:
+        korting = AH_KORTING - AH_PERC * (inkomen - AH_TARIEF_1_M1)
+    else:
+        korting = 0.0
+
+    return korting
+
+
+# Bereken de algemene heffingskorting voor een hele array van inkomens zonder Python-branches:
+# het afbouwtraject is een geklemde helling (np.clip), de staart boven AH_TARIEF_2 wordt genuld.
+def algemene_heffingskorting_vec(inkomen: np.ndarray) -> np.ndarray:
+    helling = np.clip(inkomen - AH_TARIEF_1_M1, 0.0, AH_TARIEF_2 - AH_TARIEF_1)
+
+    return np.where(inkomen < AH_TARIEF_2, AH_KORTING - AH_PERC * helling, 0.0)
+
+
+# Bereken de arbeidskorting gegeven een arbeidsinkomen.
+def arbeidskorting(inkomen: float) -> float:
+    if inkomen < AK_TARIEF_1:
+        korting = AK_SCHIJF_1_PERC * inkomen
+    elif inkomen < AK_TARIEF_2:
+        korting = AK_KORTING_1 + AK_SCHIJF_2_PERC * (inkomen - AK_TARIEF_1_M1)
+    elif inkomen < AK_TARIEF_3:
+        # Geen idee waarom nu opeens geen min 1 meer nodig is.
+        korting = AK_KORTING_2 + AK_SCHIJF_3_PERC * (inkomen - AK_TARIEF_2)
+    elif inkomen < AK_TARIEF_4:
+        korting = AK_KORTING_3 - AK_SCHIJF_4_PERC * (inkomen - AK_TARIEF_3)
+    else:
+        korting = 0.0
+
+    return korting
+
+
+# Bereken de arbeidskorting voor een hele array van inkomens. np.searchsorted bepaalt per punt
+# de schijf, waarna de korting als één lineaire uitdrukking uit de opzoektabellen volgt.
+def arbeidskorting_vec(inkomen: np.ndarray) -> np.ndarray:
+    schijf = np.searchsorted(AK_KNOTS, inkomen, side="right") - 1
+
+    return AK_INTERCEPT[schijf] + AK_HELLING[schijf] * (inkomen - AK_OFFSET[schijf])
+
+
+# Bereken de totale belasting gegeven een bruto inkomen, rekening houdend met heffingskortingen.
+def belasting(bruto: float) -> float:
+    bedrag = (
+        box1_tarief(bruto) - algemene_heffingskorting(bruto) - arbeidskorting(bruto)
+    )
+
+    return max(bedrag, 0.0)
+
+
+# Bereken de totale belasting voor een hele array van bruto inkomens in één NumPy-pass.
+def belasting_vec(bruto: np.ndarray) -> np.ndarray:
+    bedrag = (
+        box1_tarief_vec(bruto)
+        - algemene_heffingskorting_vec(bruto)
+        - arbeidskorting_vec(bruto)
+    )
+
+    return np.maximum(bedrag, 0.0)
+
+
+# Bereken het netto inkomen gegeven een bruto inkomen, rekening houdend met heffingskortingen.
+def netto(bruto: float) -> float:
+    return bruto - belasting(bruto)
+
+
+# Bereken het totale belasting percentage gegeven een bruto inkomen.
+def belasting_perc(bruto: float) -> float:
+    if bruto == 0.0:
+        return 0.0
+
+    return belasting(bruto) / bruto
+
+
+# Bereken het marginaal belasting percentage gegeven een bruto inkomen.
+def marginale_belasting(bruto: float) -> float:
+    return belasting(bruto + 1) - belasting(bruto)
+
+
+# Vul in één doorgang alle plotkolommen (structure-of-arrays). De drie componenten worden elk
+# precies één keer per grid berekend en alle afgeleide kolommen hergebruiken die resultaten.
+# De buffer is float32: de plot toont hele euro's en twee decimalen in procenten, en dit
+# halveert de data die Bokeh in de HTML inbedt.
+def bereken_kolommen(bruto: np.ndarray) -> np.ndarray:
+    box1 = box1_tarief_vec(bruto)
+    ah_korting = algemene_heffingskorting_vec(bruto)
+    ak_korting = arbeidskorting_vec(bruto)
+    bedrag = np.maximum(box1 - ah_korting - ak_korting, 0.0)
+
+    kolommen = np.empty((8, bruto.size), dtype=np.float32)
+    kolommen[0] = bruto
+    kolommen[1] = bruto - bedrag
+    kolommen[2] = box1
+    kolommen[3] = ah_korting
+    kolommen[4] = ak_korting
+    kolommen[5] = bedrag
+    # where= slaat de deling op inkomen 0 op C-niveau over; die lane houdt de vooraf gezette 0.
+    kolommen[6] = 0.0
+    np.divide(kolommen[5], kolommen[0], out=kolommen[6], where=kolommen[0] != 0.0)
+    # Het marginale tarief is het verschil van twee grote, bijna gelijke bedragen; dat verschil
+    # moet in float64 worden genomen, anders slaat de afronding door in het percentage.
+    kolommen[7] = belasting_vec(bruto + 1.0) - bedrag
+
+    return kolommen